@@ -5,13 +5,18 @@
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import re
+import orjson
+import deflate
 from datetime import datetime
-from typing import Dict, List, Optional
-import base64
-from io import BytesIO
-import zipfile
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import struct
+from string import Template
+from types import MappingProxyType
 
 # =============================================================================
 # File: config/settings.py
@@ -19,7 +24,7 @@ import zipfile
 # =============================================================================
 
 # Jurisdiction-specific compliance frameworks
-JURISDICTIONS = {
+JURISDICTIONS = MappingProxyType({
     "European Union": {
         "primary_law": "GDPR",
         "risk_factors": ["data_transfer", "consent_mechanism", "data_retention"],
@@ -40,199 +45,485 @@ JURISDICTIONS = {
         "risk_factors": ["post_brexit_adequacy", "ico_compliance", "data_transfer"],
         "required_sections": ["lawful_basis", "data_protection_officer", "breach_notification"]
     }
-}
+})
 
-BUSINESS_TYPES = {
+BUSINESS_TYPES = MappingProxyType({
     "SaaS Platform": ["user_data", "payment_processing", "analytics"],
     "E-commerce": ["customer_data", "payment_processing", "marketing", "shipping"],
     "HealthTech": ["health_data", "hipaa_compliance", "patient_records"],
     "FinTech": ["financial_data", "pci_compliance", "transaction_records"],
     "EdTech": ["student_data", "coppa_compliance", "learning_analytics"],
     "IoT/Hardware": ["device_data", "location_tracking", "sensor_data"]
-}
+})
+
+# Widget options, built once instead of on every rerun
+JURISDICTION_OPTIONS = tuple(JURISDICTIONS)
+BUSINESS_TYPE_OPTIONS = tuple(BUSINESS_TYPES)
+
+DATA_COLLECTION_OPTIONS = ("Email addresses", "Names", "Phone numbers", "Location data", 
+                           "Payment information", "Usage analytics", "Device information", 
+                           "Health data", "Financial data", "Biometric data")
+DATA_COLLECTION_DEFAULT = ("Email addresses", "Usage analytics")
+
+DATA_USAGE_OPTIONS = ("Service provision", "Marketing", "Analytics", "Customer support",
+                      "Legal compliance", "Security", "Product improvement", "Research")
+DATA_USAGE_DEFAULT = ("Service provision", "Analytics")
+
+SHARING_OPTIONS = ("No", "Yes - Service providers only", "Yes - Marketing partners", "Yes - Data brokers")
+
+RETENTION_OPTIONS = ("6 months", "12 months", "24 months", "As long as legally required", "Indefinitely")
+
+COOKIE_OPTIONS = ("Essential", "Analytics", "Marketing", "Personalization", "Social media")
+COOKIE_DEFAULT = ("Essential", "Analytics")
+
+# Prompt-ready text per jurisdiction / business type, joined once at import
+JURISDICTION_PROMPT_TEXT = MappingProxyType({
+    name: MappingProxyType({
+        "primary_law": info["primary_law"],
+        "risk_factors": ", ".join(info["risk_factors"]),
+        "required_sections": ", ".join(info["required_sections"])
+    })
+    for name, info in JURISDICTIONS.items()
+})
+
+BUSINESS_RISKS_TEXT = MappingProxyType({
+    name: ", ".join(risks) for name, risks in BUSINESS_TYPES.items()
+})
 
 # =============================================================================
 # File: utils/llm_client.py
 # OpenRouter LLM Integration
 # =============================================================================
 
+# (connect, read) seconds; the read timeout bounds the wait for a complete non-streamed answer
+REQUEST_TIMEOUT = (10, 120)
+
+# Shown in place of a document when its request fails
+ERROR_RESPONSE = "Error generating response. Please check your API key and try again."
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared keep-alive HTTP session so repeated calls reuse the TLS connection"""
+    session = requests.Session()
+    # A timed-out POST or a 500/502/504 may still be generating (and billed), so only
+    # connection errors and the "not processed" 429/503 statuses are retried
+    retries = Retry(total=2, read=0, backoff_factor=0.3, status_forcelist=[429, 503],
+                    allowed_methods=["POST"])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    return session
+
+# Shared by every session: each Generate All takes three workers, so four sessions can
+# fan out at once before requests queue. Stays within the HTTP session's 16 pooled connections.
+LLM_WORKERS = 12
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Shared worker pool for issuing independent LLM requests concurrently"""
+    return ThreadPoolExecutor(max_workers=LLM_WORKERS)
+
+def _build_payload(messages: List[Dict], model: str, stream: bool = False) -> Dict:
+    """Build the chat completion request body"""
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": 4000,
+        "stream": stream
+    }
+
+def _call_openrouter(client: "LLMClient", messages: List[Dict], model: str,
+                     validate: Optional[Callable[[str], object]] = None) -> str:
+    """Call the OpenRouter API and return the completion text"""
+    payload = _build_payload(messages, model)
+    
+    response = client.session.post(client.base_url, headers=client.headers, data=orjson.dumps(payload),
+                                   timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    
+    choice = orjson.loads(response.content)["choices"][0]
+    content = choice["message"].get("content")
+    
+    # Raising keeps unusable answers out of the cache so a retry can do better
+    if not content:
+        raise ValueError("The model returned an empty response")
+    if choice.get("finish_reason") == "length":
+        raise ValueError("The response was cut off at the token limit")
+    if validate is not None:
+        validate(content)
+    
+    return content
+
+# Kept in memory only: responses embed company contact details, and Streamlit's
+# disk persistence neither expires nor evicts entries
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _cached_response(_fetch: Callable[[], str], api_key_hash: str, messages: List[Dict], model: str) -> str:
+    """Cache responses per (api key hash, messages, model); _fetch only runs on a miss"""
+    return _fetch()
+
+class _CacheMiss(Exception):
+    """Raised by a lookup-only fetch so the miss is not cached"""
+
+def _raise_cache_miss() -> str:
+    raise _CacheMiss
+
 class LLMClient:
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self.api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.session = get_http_session()
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
     
-    def generate_response(self, messages: List[Dict], model: str = "anthropic/claude-3-haiku") -> str:
-        """Generate response using OpenRouter API"""
+    def cached_response(self, messages: List[Dict], model: str) -> Optional[str]:
+        """Return the cached answer for these messages without calling the API"""
         try:
-            payload = {
-                "model": model,
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 4000
-            }
-            
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+            return _cached_response(_raise_cache_miss, self.api_key_hash, messages, model)
+        except _CacheMiss:
+            return None
+    
+    def complete(self, messages: List[Dict], model: str = "anthropic/claude-3-haiku",
+                 validate: Optional[Callable[[str], object]] = None, fresh: bool = False) -> str:
+        """Return the response text, raising on failure; safe to call from worker threads"""
+        if fresh:
+            _cached_response.clear(None, self.api_key_hash, messages, model)
+        
+        # Failed or rejected calls raise and are therefore never cached
+        return _cached_response(lambda: _call_openrouter(self, messages, model, validate),
+                                self.api_key_hash, messages, model)
+    
+    def generate_response(self, messages: List[Dict], model: str = "anthropic/claude-3-haiku",
+                          validate: Optional[Callable[[str], object]] = None, fresh: bool = False) -> str:
+        """Generate response using OpenRouter API; fresh skips any cached answer"""
+        try:
+            return self.complete(messages, model, validate, fresh)
         
         except Exception as e:
             st.error(f"LLM API Error: {str(e)}")
-            return "Error generating response. Please check your API key and try again."
+            return ERROR_RESPONSE
+    
+    @staticmethod
+    def collect(future: Future) -> str:
+        """Return the text of a complete() call run on the pool, reporting failures here"""
+        try:
+            return future.result()
+        
+        except Exception as e:
+            # Raised on the script thread so the error renders on the caller's page
+            st.error(f"LLM API Error: {str(e)}")
+            return ERROR_RESPONSE
+    
+    def stream_response(self, messages: List[Dict], model: str = "anthropic/claude-3-haiku",
+                        fresh: bool = False) -> Iterator[str]:
+        """Stream response text from OpenRouter as server-sent events
+        
+        Raises once the stream ends if it failed, came back empty or was cut off,
+        so callers only keep text from a clean finish.
+        """
+        if fresh:
+            _cached_response.clear(None, self.api_key_hash, messages, model)
+        else:
+            cached = self.cached_response(messages, model)
+            if cached is not None:
+                yield cached
+                return
+        
+        payload = _build_payload(messages, model, stream=True)
+        chunks = []
+        finish_reason = None
+        
+        with self.session.post(self.base_url, headers=self.headers, data=orjson.dumps(payload),
+                               stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                # Skip keep-alive comments and blank separators
+                if not line.startswith(b"data: "):
+                    continue
+                data = line[len(b"data: "):]
+                if data == b"[DONE]":
+                    break
+                
+                choice = orjson.loads(data)["choices"][0]
+                content = choice["delta"].get("content")
+                if content:
+                    chunks.append(content)
+                    yield content
+                finish_reason = choice.get("finish_reason") or finish_reason
+        
+        # Same checks as _call_openrouter, so neither path keeps unusable output
+        if not chunks:
+            raise ValueError("The model returned an empty response")
+        if finish_reason == "length":
+            raise ValueError("The response was cut off at the token limit")
+        
+        # Store the finished answer under the same key generate_response uses
+        text = "".join(chunks)
+        _cached_response(lambda: text, self.api_key_hash, messages, model)
 
 # =============================================================================
 # File: components/policy_generator.py
 # Core Policy Generation Logic
 # =============================================================================
 
+# Display color per risk level
+RISK_COLORS = MappingProxyType({'Low': 'green', 'Medium': 'orange', 'High': 'red'})
+
+class RiskReport(NamedTuple):
+    """Compliance risk assessment normalized for display"""
+    level: str
+    areas: tuple
+    items: tuple
+    timeline: Optional[str]
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RiskReport":
+        """Build a report from the model's JSON, tolerating missing keys"""
+        timeline = data.get('timeline')
+        return cls(
+            level=str(data.get('risk_level', 'Medium')),
+            areas=tuple(data.get('risk_areas', ())),
+            items=tuple(data.get('action_items', ())),
+            timeline=str(timeline) if timeline is not None else None
+        )
+    
+    @property
+    def color(self) -> str:
+        """Display color for the risk level"""
+        return RISK_COLORS.get(self.level, 'gray')
+
+def parse_risk_json(response: str) -> Dict:
+    """Parse the risk assessment JSON, tolerating a surrounding markdown code fence"""
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError("Risk assessment response is not valid JSON") from e
+    if not isinstance(data, dict):
+        raise ValueError("Risk assessment response is not a JSON object")
+    return data
+
+# Returned when the risk assessment response is not valid JSON
+RISK_ASSESSMENT_FALLBACK = RiskReport(
+    level="Medium",
+    areas=("Data retention policies", "Consent mechanisms", "Third-party integrations"),
+    items=("Review data retention", "Implement consent management", "Audit third-party services"),
+    timeline="3-6 months for full compliance"
+)
+
+PRIVACY_POLICY_SYSTEM_PROMPT = "You are a legal compliance expert specializing in privacy laws. Generate accurate, comprehensive privacy policies that comply with local regulations."
+
+PRIVACY_POLICY_PROMPT = """
+Generate a comprehensive privacy policy for a {business_type} startup operating in {jurisdiction}.
+
+Company Details:
+- Company Name: {company_name}
+- Website: {website}
+- Contact Email: {email}
+- Address: {address}
+
+Data Practices:
+- Data Collection: {collection}
+- Data Usage: {usage}
+- Third-party Sharing: {sharing}
+- Data Retention: {retention}
+- Cookies Used: {cookies}
+
+Legal Framework: {primary_law}
+Required Sections: {required_sections}
+
+Generate a complete, legally-compliant privacy policy with:
+1. Clear, plain language explanations
+2. All required sections for {jurisdiction}
+3. Specific clauses for {business_type} businesses
+4. Contact information and grievance procedures
+5. Data subject rights and procedures
+
+Format the output in clean markdown with proper headers and sections.
+"""
+
+COOKIE_BANNER_SYSTEM_PROMPT = "You are a privacy compliance expert. Generate user-friendly cookie notices that meet legal requirements."
+
+COOKIE_BANNER_PROMPT = """
+Generate a cookie banner/notice for a website operating in {jurisdiction}.
+
+Cookie Types Used:
+{cookie_types}
+
+Requirements:
+- Compliant with {primary_law}
+- Clear consent mechanism
+- Easy opt-out options
+- Mobile-friendly text
+
+Provide both the banner text and technical implementation guidance.
+"""
+
+RISK_ASSESSMENT_SYSTEM_PROMPT = "You are a privacy risk assessment expert. Provide accurate risk evaluations and actionable recommendations."
+
+RISK_ASSESSMENT_PROMPT = """
+Assess the privacy compliance risk for a {business_type} operating in {jurisdiction}.
+
+Data Practices:
+{data_practices}
+
+Key Risk Factors for {jurisdiction}:
+{risk_factors}
+
+Business-Specific Risks:
+{business_risks}
+
+Provide:
+1. Overall Risk Level (Low/Medium/High)
+2. Top 3 specific risk areas
+3. Immediate action items
+4. Compliance timeline recommendations
+
+Format as JSON with clear structure.
+"""
+
 class PolicyGenerator:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
     
+    def _privacy_policy_messages(self, jurisdiction: str, business_type: str, 
+                                 company_details: Dict, data_practices: Dict) -> List[Dict]:
+        """Build the chat messages for a privacy policy request"""
+        legal = JURISDICTION_PROMPT_TEXT.get(jurisdiction, {})
+        
+        prompt = PRIVACY_POLICY_PROMPT.format_map({
+            "business_type": business_type,
+            "jurisdiction": jurisdiction,
+            "company_name": company_details.get('name', 'Your Company'),
+            "website": company_details.get('website', 'yourcompany.com'),
+            "email": company_details.get('email', 'privacy@yourcompany.com'),
+            "address": company_details.get('address', 'Company Address'),
+            "collection": data_practices.get('collection', []),
+            "usage": data_practices.get('usage', []),
+            "sharing": data_practices.get('sharing', 'No'),
+            "retention": data_practices.get('retention', '12 months'),
+            "cookies": data_practices.get('cookies', 'Essential only'),
+            "primary_law": legal.get('primary_law', 'General Privacy Laws'),
+            "required_sections": legal.get('required_sections', '')
+        })
+        
+        return [
+            {"role": "system", "content": PRIVACY_POLICY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
     def generate_privacy_policy(self, jurisdiction: str, business_type: str, 
-                              company_details: Dict, data_practices: Dict) -> str:
+                              company_details: Dict, data_practices: Dict, fresh: bool = False) -> str:
         """Generate comprehensive privacy policy"""
-        
-        jurisdiction_info = JURISDICTIONS.get(jurisdiction, {})
-        business_info = BUSINESS_TYPES.get(business_type, [])
-        
-        prompt = f"""
-        Generate a comprehensive privacy policy for a {business_type} startup operating in {jurisdiction}.
-        
-        Company Details:
-        - Company Name: {company_details.get('name', 'Your Company')}
-        - Website: {company_details.get('website', 'yourcompany.com')}
-        - Contact Email: {company_details.get('email', 'privacy@yourcompany.com')}
-        - Address: {company_details.get('address', 'Company Address')}
-        
-        Data Practices:
-        - Data Collection: {data_practices.get('collection', [])}
-        - Data Usage: {data_practices.get('usage', [])}
-        - Third-party Sharing: {data_practices.get('sharing', 'No')}
-        - Data Retention: {data_practices.get('retention', '12 months')}
-        - Cookies Used: {data_practices.get('cookies', 'Essential only')}
-        
-        Legal Framework: {jurisdiction_info.get('primary_law', 'General Privacy Laws')}
-        Required Sections: {jurisdiction_info.get('required_sections', [])}
-        
-        Generate a complete, legally-compliant privacy policy with:
-        1. Clear, plain language explanations
-        2. All required sections for {jurisdiction}
-        3. Specific clauses for {business_type} businesses
-        4. Contact information and grievance procedures
-        5. Data subject rights and procedures
-        
-        Format the output in clean markdown with proper headers and sections.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are a legal compliance expert specializing in privacy laws. Generate accurate, comprehensive privacy policies that comply with local regulations."},
+        messages = self._privacy_policy_messages(jurisdiction, business_type, company_details, data_practices)
+        return self.llm_client.generate_response(messages, fresh=fresh)
+    
+    def stream_privacy_policy(self, jurisdiction: str, business_type: str, 
+                            company_details: Dict, data_practices: Dict, fresh: bool = False) -> Iterator[str]:
+        """Stream comprehensive privacy policy as it is generated"""
+        messages = self._privacy_policy_messages(jurisdiction, business_type, company_details, data_practices)
+        return self.llm_client.stream_response(messages, fresh=fresh)
+    
+    def _cookie_banner_messages(self, jurisdiction: str, cookie_types: List[str]) -> List[Dict]:
+        """Build the chat messages for a cookie banner request"""
+        prompt = COOKIE_BANNER_PROMPT.format_map({
+            "jurisdiction": jurisdiction,
+            "cookie_types": ', '.join(cookie_types),
+            "primary_law": JURISDICTION_PROMPT_TEXT.get(jurisdiction, {}).get('primary_law', 'privacy laws')
+        })
+        
+        return [
+            {"role": "system", "content": COOKIE_BANNER_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ]
-        
-        return self.llm_client.generate_response(messages)
     
-    def generate_cookie_banner(self, jurisdiction: str, cookie_types: List[str]) -> str:
+    def generate_cookie_banner(self, jurisdiction: str, cookie_types: List[str], fresh: bool = False) -> str:
         """Generate cookie banner content"""
-        
-        prompt = f"""
-        Generate a cookie banner/notice for a website operating in {jurisdiction}.
-        
-        Cookie Types Used:
-        {', '.join(cookie_types)}
-        
-        Requirements:
-        - Compliant with {JURISDICTIONS.get(jurisdiction, {}).get('primary_law', 'privacy laws')}
-        - Clear consent mechanism
-        - Easy opt-out options
-        - Mobile-friendly text
-        
-        Provide both the banner text and technical implementation guidance.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are a privacy compliance expert. Generate user-friendly cookie notices that meet legal requirements."},
+        return self.llm_client.generate_response(self._cookie_banner_messages(jurisdiction, cookie_types),
+                                                 fresh=fresh)
+    
+    def stream_cookie_banner(self, jurisdiction: str, cookie_types: List[str], fresh: bool = False) -> Iterator[str]:
+        """Stream cookie banner content as it is generated"""
+        return self.llm_client.stream_response(self._cookie_banner_messages(jurisdiction, cookie_types),
+                                               fresh=fresh)
+    
+    def _risk_assessment_messages(self, jurisdiction: str, business_type: str, 
+                                  data_practices: Dict) -> List[Dict]:
+        """Build the chat messages for a risk assessment request"""
+        prompt = RISK_ASSESSMENT_PROMPT.format_map({
+            "business_type": business_type,
+            "jurisdiction": jurisdiction,
+            "data_practices": json.dumps(data_practices, indent=2),
+            "risk_factors": JURISDICTION_PROMPT_TEXT.get(jurisdiction, {}).get('risk_factors', ''),
+            "business_risks": BUSINESS_RISKS_TEXT.get(business_type, '')
+        })
+        
+        return [
+            {"role": "system", "content": RISK_ASSESSMENT_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ]
-        
-        return self.llm_client.generate_response(messages)
     
     def assess_compliance_risk(self, jurisdiction: str, business_type: str, 
-                             data_practices: Dict) -> Dict:
+                             data_practices: Dict, fresh: bool = False) -> RiskReport:
         """Assess compliance risk level"""
-        
-        risk_factors = JURISDICTIONS.get(jurisdiction, {}).get('risk_factors', [])
-        business_risks = BUSINESS_TYPES.get(business_type, [])
-        
-        prompt = f"""
-        Assess the privacy compliance risk for a {business_type} operating in {jurisdiction}.
-        
-        Data Practices:
-        {json.dumps(data_practices, indent=2)}
-        
-        Key Risk Factors for {jurisdiction}:
-        {', '.join(risk_factors)}
-        
-        Business-Specific Risks:
-        {', '.join(business_risks)}
-        
-        Provide:
-        1. Overall Risk Level (Low/Medium/High)
-        2. Top 3 specific risk areas
-        3. Immediate action items
-        4. Compliance timeline recommendations
-        
-        Format as JSON with clear structure.
-        """
-        
-        messages = [
-            {"role": "system", "content": "You are a privacy risk assessment expert. Provide accurate risk evaluations and actionable recommendations."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self.llm_client.generate_response(messages)
-        
-        # Parse JSON response or return structured fallback
+        messages = self._risk_assessment_messages(jurisdiction, business_type, data_practices)
+        response = self.llm_client.generate_response(messages, validate=parse_risk_json, fresh=fresh)
+        return self._risk_report(response)
+    
+    @staticmethod
+    def _risk_report(response: str) -> RiskReport:
+        """Parse JSON response or return structured fallback"""
         try:
-            return json.loads(response)
+            return RiskReport.from_dict(parse_risk_json(response))
         except:
-            return {
-                "risk_level": "Medium",
-                "risk_areas": ["Data retention policies", "Consent mechanisms", "Third-party integrations"],
-                "action_items": ["Review data retention", "Implement consent management", "Audit third-party services"],
-                "timeline": "3-6 months for full compliance"
-            }
+            return RISK_ASSESSMENT_FALLBACK
+    
+    def generate_bundle(self, jurisdiction: str, business_type: str, company_details: Dict,
+                        data_practices: Dict, cookie_types: List[str], fresh: bool = False) -> Dict:
+        """Generate privacy policy, cookie banner and risk assessment concurrently"""
+        
+        complete = self.llm_client.complete
+        executor = get_executor()
+        
+        # The three requests are independent, so wait for the slowest rather than the sum.
+        # Workers only make the calls; errors are reported here, on the script thread.
+        policy = executor.submit(complete, self._privacy_policy_messages(
+            jurisdiction, business_type, company_details, data_practices
+        ), fresh=fresh)
+        banner = executor.submit(complete, self._cookie_banner_messages(jurisdiction, cookie_types), fresh=fresh)
+        risk = executor.submit(complete, self._risk_assessment_messages(
+            jurisdiction, business_type, data_practices
+        ), validate=parse_risk_json, fresh=fresh)
+        
+        return {
+            "privacy_policy": self.llm_client.collect(policy),
+            "cookie_banner": self.llm_client.collect(banner),
+            "risk_assessment": self._risk_report(self.llm_client.collect(risk))
+        }
 
 # =============================================================================
 # File: components/document_exporter.py
 # Document Export Functionality
 # =============================================================================
 
-class DocumentExporter:
-    @staticmethod
-    def create_download_package(documents: Dict[str, str], company_name: str) -> BytesIO:
-        """Create a ZIP file with all generated documents"""
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for doc_name, content in documents.items():
-                # Clean filename
-                filename = f"{doc_name.lower().replace(' ', '_')}.md"
-                zip_file.writestr(filename, content)
-            
-            # Add a README
-            readme_content = f"""
-# {company_name} - Privacy Compliance Package
+# Single-pass "lower-case, spaces to underscores" for the ASCII document names
+FILENAME_TABLE = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ ",
+    "abcdefghijklmnopqrstuvwxyz_"
+)
+
+README_TEMPLATE = Template("""
+# $company - Privacy Compliance Package
 
-Generated on: {datetime.now().strftime("%B %d, %Y")}
+Generated on: $date
 
 ## Contents:
-{chr(10).join([f"- {name}" for name in documents.keys()])}
+$contents
 
 ## Next Steps:
 1. Review all documents with legal counsel
@@ -244,11 +535,125 @@ Generated on: {datetime.now().strftime("%B %d, %Y")}
 ## Disclaimer:
 These documents are generated for informational purposes. 
 Please consult with qualified legal counsel before implementation.
-"""
+""")
+
+def compress_document(text: str) -> bytes:
+    """Compress a generated document for storage in session state"""
+    return bytes(deflate.gzip_compress(text.encode("utf-8"), 6))
+
+def decompress_document(blob: bytes) -> str:
+    """Restore a document stored with compress_document"""
+    return deflate.gzip_decompress(blob).decode("utf-8")
+
+class ZipPackageWriter:
+    """Write-only ZIP archive whose entries are compressed with libdeflate"""
+    
+    ZIP_STORED = 0
+    ZIP_DEFLATED = 8
+    
+    # DEFLATE's block headers outweigh any savings on entries smaller than this
+    MIN_DEFLATE_SIZE = 512
+    
+    def __init__(self, buffer: bytearray, compresslevel: int = 6):
+        # Appending to a bytearray avoids BytesIO's extra copy on getvalue()
+        self.buffer = buffer
+        self.compresslevel = compresslevel
+        self.central_directory = []
+        
+        # Every entry shares the archive's creation time, in MS-DOS format
+        now = datetime.now()
+        self.dos_time = (now.hour << 11) | (now.minute << 5) | (now.second // 2)
+        self.dos_date = ((now.year - 1980) << 9) | (now.month << 5) | now.day
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+    
+    def _compress(self, data: bytes) -> Tuple[bytes, int, int]:
+        """Return the stored payload, CRC-32 and compression method for one entry"""
+        crc = deflate.crc32(data)
+        if len(data) >= self.MIN_DEFLATE_SIZE:
+            compressed = deflate.deflate_compress(data, self.compresslevel)
+            if len(compressed) < len(data):
+                return compressed, crc, self.ZIP_DEFLATED
+        return data, crc, self.ZIP_STORED
+    
+    def _write_entry(self, filename: str, data: bytes, compressed: bytes, crc: int, method: int):
+        """Write a local header plus payload and record its central directory entry"""
+        name = filename.encode("utf-8")
+        offset = len(self.buffer)
+        
+        # Sizes and CRC are known up front, so no data descriptor is needed
+        self.buffer += struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 20, 0x0800, method, self.dos_time, self.dos_date,
+            crc, len(compressed), len(data), len(name), 0
+        )
+        self.buffer += name
+        self.buffer += compressed
+        
+        self.central_directory.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, 0x0314, 20, 0x0800, method, self.dos_time, self.dos_date,
+            crc, len(compressed), len(data), len(name), 0, 0, 0, 0, 0o644 << 16, offset
+        ) + name)
+    
+    def writestr(self, filename: str, data: Union[str, bytes]):
+        """Add a file to the archive; str content is UTF-8 encoded"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._write_entry(filename, data, *self._compress(data))
+    
+    def close(self):
+        """Write the central directory and end-of-central-directory record"""
+        cd_offset = len(self.buffer)
+        central_directory = b"".join(self.central_directory)
+        entries = len(self.central_directory)
+        
+        # No ZIP64 records are written, so the classic format's limits must hold
+        if entries > 0xFFFF or cd_offset + len(central_directory) > 0xFFFFFFFF:
+            raise ValueError("Package too large for a ZIP archive without ZIP64 extensions")
+        
+        self.buffer += central_directory
+        self.buffer += struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, entries, entries, len(central_directory), cd_offset, 0
+        )
+
+class DocumentExporter:
+    @staticmethod
+    def create_download_package(documents: Dict[str, str], company_name: str,
+                                generated_on: Optional[str] = None) -> bytes:
+        """Create a ZIP file with all generated documents"""
+        package = bytearray()
+        
+        # One pass encodes every document and collects the README contents lines
+        doc_files = []
+        contents_lines = []
+        for doc_name, content in documents.items():
+            doc_files.append((f"{doc_name.translate(FILENAME_TABLE)}.md", content.encode("utf-8")))
+            contents_lines.append(f"- {doc_name}")
+        
+        # Level 1 is far faster than 6 and only marginally larger on markdown text
+        with ZipPackageWriter(package, compresslevel=1) as zip_file:
+            for filename, data in doc_files:
+                zip_file.writestr(filename, data)
+            
+            # Add a README
+            readme_content = README_TEMPLATE.substitute(
+                company=company_name,
+                date=generated_on or datetime.now().strftime("%B %d, %Y"),
+                contents="\n".join(contents_lines)
+            )
             zip_file.writestr("README.md", readme_content)
         
-        zip_buffer.seek(0)
-        return zip_buffer
+        return bytes(package)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_package(documents: tuple, company_name: str, generated_on: str) -> bytes:
+    """Build the ZIP package once per unique (compressed documents, company name, date)"""
+    texts = {doc_name: decompress_document(blob) for doc_name, blob in documents}
+    return DocumentExporter.create_download_package(texts, company_name, generated_on)
 
 # =============================================================================
 # File: main.py (Streamlit App)
@@ -260,7 +665,96 @@ def initialize_session_state():
     if 'documents' not in st.session_state:
         st.session_state.documents = {}
     if 'risk_assessment' not in st.session_state:
-        st.session_state.risk_assessment = {}
+        st.session_state.risk_assessment = None
+
+@st.fragment
+def render_results(company_name: str):
+    """Render results as a fragment so download clicks only rerun this section"""
+    if st.session_state.documents or st.session_state.risk_assessment:
+        st.markdown("---")
+        st.header("📊 Results")
+        
+        # Risk Assessment Display
+        if st.session_state.risk_assessment:
+            st.subheader("🎯 Compliance Risk Assessment")
+            
+            risk = st.session_state.risk_assessment
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                # Risk level with color coding
+                st.metric("Risk Level", risk.level, delta=None)
+                st.markdown(f"<span style='color: {risk.color}'>{risk.level} Risk</span>", 
+                           unsafe_allow_html=True)
+            
+            with col2:
+                st.write("**Top Risk Areas:**")
+                for area in risk.areas[:3]:
+                    st.write(f"• {area}")
+            
+            with col3:
+                st.write("**Action Items:**")
+                for item in risk.items[:3]:
+                    st.write(f"• {item}")
+            
+            if risk.timeline is not None:
+                st.info(f"**Recommended Timeline:** {risk.timeline}")
+        
+        # Documents Display
+        # Per-document buttons pin each file's bytes in widget state, so they are opt-in
+        individual_downloads = bool(st.session_state.documents) and st.toggle(
+            "Enable individual downloads", key="individual_downloads"
+        )
+        
+        for doc_name, blob in st.session_state.documents.items():
+            st.subheader(f"📄 {doc_name}")
+            
+            # Documents are stored compressed; only decompress for rendering on request
+            if st.toggle(f"View {doc_name}", key=f"view_{doc_name}"):
+                # Shown as source so the full markdown-to-HTML render is skipped
+                st.code(decompress_document(blob), language="markdown", wrap_lines=True)
+            
+            # Download individual document
+            if individual_downloads:
+                st.download_button(
+                    label=f"📥 Download {doc_name}",
+                    data=decompress_document(blob),
+                    file_name=f"{doc_name.translate(FILENAME_TABLE)}.md",
+                    mime="text/markdown"
+                )
+        
+        # Download All Documents
+        if st.session_state.documents:
+            st.markdown("---")
+            
+            # Create download package (sorted so equal document sets share a cache entry;
+            # the date is part of the key so the README never shows a stale day)
+            documents_package = build_package(
+                tuple(sorted(st.session_state.documents.items())), 
+                company_name,
+                datetime.now().strftime("%B %d, %Y")
+            )
+            
+            st.download_button(
+                label="📦 Download Complete Compliance Package",
+                data=documents_package,
+                file_name=f"{company_name.lower().replace(' ', '_')}_compliance_package.zip",
+                mime="application/zip",
+                type="primary"
+            )
+
+def stream_document(stream_area, doc_name: str, stream: Iterator[str]):
+    """Stream a document into stream_area, storing it only if generation finished cleanly"""
+    try:
+        text = stream_area.write_stream(stream)
+    except Exception as e:
+        # Drop the partial text so it isn't mistaken for a finished document
+        stream_area.empty()
+        st.error(f"LLM API Error: {str(e)}")
+        return
+    
+    st.session_state.documents[doc_name] = compress_document(text)
 
 def main():
     st.set_page_config(
@@ -287,12 +781,19 @@ def main():
         help="Get your free API key from openrouter.ai"
     )
     
+    # Sampled answers differ run to run, so let users ask for a new one
+    regenerate = st.sidebar.checkbox(
+        "Regenerate responses",
+        help="Skip previously generated answers for the same inputs and request new ones"
+    )
+    
     if not api_key:
         st.warning("Please enter your OpenRouter API key in the sidebar to continue.")
         st.info("🔗 Get your free API key at [openrouter.ai](https://openrouter.ai)")
         return
     
-    # Initialize clients
+    # Initialize clients; the client is cheap since the HTTP session is shared, and
+    # building it per rerun avoids holding every user's plaintext key in a global cache
     llm_client = LLMClient(api_key)
     policy_generator = PolicyGenerator(llm_client)
     
@@ -304,13 +805,13 @@ def main():
         
         jurisdiction = st.selectbox(
             "Operating Jurisdiction",
-            list(JURISDICTIONS.keys()),
+            JURISDICTION_OPTIONS,
             help="Primary jurisdiction where your business operates"
         )
         
         business_type = st.selectbox(
             "Business Type",
-            list(BUSINESS_TYPES.keys()),
+            BUSINESS_TYPE_OPTIONS,
             help="Your primary business model"
         )
         
@@ -327,35 +828,32 @@ def main():
         # Data Collection
         data_collection = st.multiselect(
             "What data do you collect?",
-            ["Email addresses", "Names", "Phone numbers", "Location data", 
-             "Payment information", "Usage analytics", "Device information", 
-             "Health data", "Financial data", "Biometric data"],
-            default=["Email addresses", "Usage analytics"]
+            DATA_COLLECTION_OPTIONS,
+            default=DATA_COLLECTION_DEFAULT
         )
         
         # Data Usage
         data_usage = st.multiselect(
             "How do you use this data?",
-            ["Service provision", "Marketing", "Analytics", "Customer support",
-             "Legal compliance", "Security", "Product improvement", "Research"],
-            default=["Service provision", "Analytics"]
+            DATA_USAGE_OPTIONS,
+            default=DATA_USAGE_DEFAULT
         )
         
         # Additional practices
         third_party_sharing = st.radio(
             "Do you share data with third parties?",
-            ["No", "Yes - Service providers only", "Yes - Marketing partners", "Yes - Data brokers"]
+            SHARING_OPTIONS
         )
         
         data_retention = st.selectbox(
             "Data retention period",
-            ["6 months", "12 months", "24 months", "As long as legally required", "Indefinitely"]
+            RETENTION_OPTIONS
         )
         
         cookie_types = st.multiselect(
             "Cookie types used",
-            ["Essential", "Analytics", "Marketing", "Personalization", "Social media"],
-            default=["Essential", "Analytics"]
+            COOKIE_OPTIONS,
+            default=COOKIE_DEFAULT
         )
     
     # Generate Documents
@@ -364,6 +862,11 @@ def main():
     
     col1, col2, col3 = st.columns(3)
     
+    generate_all = st.button("🚀 Generate All Documents", use_container_width=True)
+    
+    # Full-width area below the buttons where generated text streams in
+    stream_area = st.empty()
+    
     company_details = {
         'name': company_name,
         'website': website,
@@ -381,94 +884,36 @@ def main():
     
     with col1:
         if st.button("📋 Generate Privacy Policy", type="primary"):
-            with st.spinner("Generating privacy policy..."):
-                policy = policy_generator.generate_privacy_policy(
-                    jurisdiction, business_type, company_details, data_practices
-                )
-                st.session_state.documents['Privacy Policy'] = policy
+            stream_document(stream_area, 'Privacy Policy', policy_generator.stream_privacy_policy(
+                jurisdiction, business_type, company_details, data_practices, fresh=regenerate
+            ))
     
     with col2:
         if st.button("🍪 Generate Cookie Banner", type="primary"):
-            with st.spinner("Generating cookie banner..."):
-                banner = policy_generator.generate_cookie_banner(jurisdiction, cookie_types)
-                st.session_state.documents['Cookie Banner'] = banner
+            stream_document(stream_area, 'Cookie Banner', policy_generator.stream_cookie_banner(
+                jurisdiction, cookie_types, fresh=regenerate
+            ))
     
     with col3:
         if st.button("⚠️ Assess Compliance Risk", type="primary"):
             with st.spinner("Assessing compliance risk..."):
                 risk = policy_generator.assess_compliance_risk(
-                    jurisdiction, business_type, data_practices
+                    jurisdiction, business_type, data_practices, fresh=regenerate
                 )
                 st.session_state.risk_assessment = risk
     
-    # Display Results
-    if st.session_state.documents or st.session_state.risk_assessment:
-        st.markdown("---")
-        st.header("📊 Results")
-        
-        # Risk Assessment Display
-        if st.session_state.risk_assessment:
-            st.subheader("🎯 Compliance Risk Assessment")
-            
-            risk_data = st.session_state.risk_assessment
-            
-            # Risk level with color coding
-            risk_level = risk_data.get('risk_level', 'Medium')
-            risk_colors = {'Low': 'green', 'Medium': 'orange', 'High': 'red'}
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Risk Level", risk_level, delta=None)
-                st.markdown(f"<span style='color: {risk_colors.get(risk_level, 'gray')}'>{risk_level} Risk</span>", 
-                           unsafe_allow_html=True)
-            
-            with col2:
-                st.write("**Top Risk Areas:**")
-                for area in risk_data.get('risk_areas', [])[:3]:
-                    st.write(f"• {area}")
-            
-            with col3:
-                st.write("**Action Items:**")
-                for item in risk_data.get('action_items', [])[:3]:
-                    st.write(f"• {item}")
-            
-            if 'timeline' in risk_data:
-                st.info(f"**Recommended Timeline:** {risk_data['timeline']}")
-        
-        # Documents Display
-        for doc_name, content in st.session_state.documents.items():
-            st.subheader(f"📄 {doc_name}")
-            
-            # Display content in expandable section
-            with st.expander(f"View {doc_name}", expanded=False):
-                st.markdown(content)
-            
-            # Download individual document
-            st.download_button(
-                label=f"📥 Download {doc_name}",
-                data=content,
-                file_name=f"{doc_name.lower().replace(' ', '_')}.md",
-                mime="text/markdown"
-            )
-        
-        # Download All Documents
-        if st.session_state.documents:
-            st.markdown("---")
-            
-            # Create download package
-            documents_package = DocumentExporter.create_download_package(
-                st.session_state.documents, 
-                company_name
-            )
-            
-            st.download_button(
-                label="📦 Download Complete Compliance Package",
-                data=documents_package.getvalue(),
-                file_name=f"{company_name.lower().replace(' ', '_')}_compliance_package.zip",
-                mime="application/zip",
-                type="primary"
+    if generate_all:
+        with st.spinner("Generating all compliance documents..."):
+            bundle = policy_generator.generate_bundle(
+                jurisdiction, business_type, company_details, data_practices, cookie_types,
+                fresh=regenerate
             )
+            st.session_state.documents['Privacy Policy'] = compress_document(bundle['privacy_policy'])
+            st.session_state.documents['Cookie Banner'] = compress_document(bundle['cookie_banner'])
+            st.session_state.risk_assessment = bundle['risk_assessment']
+    
+    # Display Results
+    render_results(company_name)
     
     # Footer
     st.markdown("---")